@@ -15,13 +15,36 @@ short_description: Look up credentials for the Windows OCI instances.
 description:
   - Look up windows credentials for the instance.
   - Lookup is based on the instance's `OCID` value.
+notes:
+  - The OCI config file is read from the path in the C(OCI_CONFIG_FILE) environment variable,
+    or from C(~/.oci/config) when it is not set.
+  - The C(OCI_CONFIG_PROFILE) environment variable selects the config profile and takes precedence
+    over the I(oci_profile) option.
+  - Both environment variables are read once, when the plugin is loaded.
 options:
   _terms:
     description: OCID of the instances to look up for credentials.
     required: True
   oci_profile:
-    description: OCI credentials profile name.
+    description:
+        - OCI credentials profile name.
+        - Ignored when the C(OCI_CONFIG_PROFILE) environment variable is set.
+        - Defaults to C(DEFAULT) when neither is set.
     required: False
+  join:
+    description:
+        - Return a single string instead of a list of credentials.
+        - The string holds one C(username:password) line per instance, in the order of the terms.
+    default: False
+    type: boolean
+  retries:
+    description:
+        - Number of times a failed OCI API call is retried after the first attempt.
+        - Only errors the OCI SDK treats as transient are retried, such as throttling (HTTP 429)
+          and server errors (HTTP 5xx). Missing or denied resources are never retried.
+        - Set to C(0) to disable retries.
+    default: 1
+    type: integer
   on_missing:
     description:
         - Action to take if the secret is missing.
@@ -48,6 +71,9 @@ EXAMPLES = r'''
   vars:
     ansible_user: "{{ lookup('oci_compute_instance_credentials', 'ocid1.instance.oc1.eu-frankfurt-1.instance_id' }}"
     ansible_password: "{{ lookup('oci_compute_instance_credentials', 'ocid1.instance.oc1.eu-frankfurt-1.instance_id' }}"
+- name: show credentials of several instances as username:password lines
+  debug: msg="{{ lookup('oci_compute_instance_credentials', instance_id_1, instance_id_2, join=True) }}"
+
 - name: skip if secret does not exist
   debug: msg="{{ lookup('oci_secret', 'secret-not-exist', on_missing='skip')}}"
 
@@ -59,6 +85,7 @@ RETURN = r'''
 instance_credentials:
     description:
         - InstanceCredentials resource
+        - With I(join=True) a single string is returned instead, with one C(username:password) line per instance.
     returned: on success
     type: complex
     contains:
@@ -81,60 +108,70 @@ instance_credentials:
 '''
 
 from ansible.errors import AnsibleError
-from ansible.module_utils.six import string_types
 
 try:
-    from oci import config, exceptions
+    from oci import exceptions
 except ImportError as import_error:
     raise AnsibleError("The lookup oci_secret requires oci python SDK.") from import_error
 
 from ansible.plugins.lookup import LookupBase
 from ansible.module_utils._text import to_native
-from ansible_collections.itd27m01.oci.plugins.module_utils.oci_instance_credentials import get_instance_credentials
+from ansible_collections.itd27m01.oci.plugins.module_utils.oci_common import (OCI_CONFIG_FILE, get_oci_config,
+                                                                              get_oci_config_profile,
+                                                                              get_retry_strategy, validate_action)
+from ansible_collections.itd27m01.oci.plugins.module_utils.oci_instance_credentials import (get_core_client,
+                                                                                            get_instance_credentials)
 
-from os import path, environ
+from concurrent.futures import ThreadPoolExecutor
 
 
 class LookupModule(LookupBase):
-    def _get_oci_config(self):
-        oci_config_file = path.join(path.expanduser("~"), ".oci", "config")
-        oci_config_profile = 'DEFAULT'
-
-        if "OCI_CONFIG_PROFILE" in environ:
-            oci_config_profile = environ.get("OCI_CONFIG_PROFILE")
-        elif self.get_option("oci_profile") is not None:
-            oci_config_profile = self.get_option('oci_profile')
-
-        return config.from_file(file_location=oci_config_file, profile_name=oci_config_profile)
-
     def run(self, terms, variables, **kwargs):
 
-        missing = kwargs.get('on_missing', 'error').lower()
-        if not isinstance(missing, string_types) or missing not in ['error', 'warn', 'skip']:
-            raise AnsibleError('"on_missing" must be a string and one of "error", "warn" or "skip", not %s' % missing)
-
-        denied = kwargs.get('on_denied', 'error').lower()
-        if not isinstance(denied, string_types) or denied not in ['error', 'warn', 'skip']:
-            raise AnsibleError('"on_denied" must be a string and one of "error", "warn" or "skip", not %s' % denied)
+        try:
+            missing = validate_action('on_missing', kwargs.get('on_missing', 'error'))
+            denied = validate_action('on_denied', kwargs.get('on_denied', 'error'))
+        except ValueError as e:
+            raise AnsibleError(to_native(e)) from e
 
         self.set_options(var_options=variables, direct=kwargs)
-        oci_config = self._get_oci_config()
+        oci_config_profile = get_oci_config_profile(self.get_option('oci_profile'))
+        oci_config = get_oci_config(OCI_CONFIG_FILE, oci_config_profile)
+
+        try:
+            retry_strategy = get_retry_strategy(self.get_option('retries'))
+        except ValueError as e:
+            raise AnsibleError(to_native(e)) from e
+
+        core_client = get_core_client(oci_config)
 
         credentials = []
-        for term in terms:
+        with ThreadPoolExecutor(max_workers=max(1, min(16, len(terms)))) as executor:
+            futures = [executor.submit(get_instance_credentials, core_client, term, retry_strategy) for term in terms]
             try:
-                credentials.append(get_instance_credentials(oci_config, term))
-                if not credentials and missing == 'error':
-                    raise AnsibleError("Failed to find instance credentials %s (ResourceNotFound)" % term)
-                elif not credentials and missing == 'warn':
-                    self._display.warning('Skipping, did not find secret %s' % term)
-
-            except exceptions.ServiceError as e:
-                raise AnsibleError("Failed to retrieve instance credentials: %s" % to_native(e)) from e
-
-        if kwargs.get('join'):
-            joined_credentials = list()
-            joined_credentials.append(''.join(credentials))
-            return joined_credentials
+                for term, future in zip(terms, futures):
+                    try:
+                        credentials.append(future.result())
+
+                    except exceptions.ServiceError as e:
+                        if e.status == 404 and missing != 'error':
+                            if missing == 'warn':
+                                self._display.warning('Skipping, did not find instance credentials %s' % term)
+                        elif e.status in (401, 403) and denied != 'error':
+                            if denied == 'warn':
+                                self._display.warning('Skipping, access to instance credentials %s is denied' % term)
+                        elif e.status == 404:
+                            raise AnsibleError("Failed to find instance credentials %s (ResourceNotFound)"
+                                               % term) from e
+                        else:
+                            raise AnsibleError("Failed to retrieve instance credentials: %s"
+                                               % to_native(e)) from e
+            except Exception:
+                for pending in futures:
+                    pending.cancel()
+                raise
+
+        if self.get_option('join'):
+            return ['\n'.join('%s:%s' % (c.username, c.password) for c in credentials)]
         else:
             return credentials
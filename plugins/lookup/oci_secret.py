@@ -17,12 +17,21 @@ description:
     has the appropriate permissions to read the secret.
   - Lookup is based on the secret's `Name` value.
   - Optional parameters can be passed into this lookup; `version_id` and `version_stage`
+notes:
+  - The OCI config file is read from the path in the C(OCI_CONFIG_FILE) environment variable,
+    or from C(~/.oci/config) when it is not set.
+  - The C(OCI_CONFIG_PROFILE) environment variable selects the config profile and takes precedence
+    over the I(oci_profile) option.
+  - Both environment variables are read once, when the plugin is loaded.
 options:
   _terms:
     description: Name of the secret to look up in OCI Vault.
     required: True
   oci_profile:
-    description: OCI credentials profile name.
+    description:
+        - OCI credentials profile name.
+        - Ignored when the C(OCI_CONFIG_PROFILE) environment variable is set.
+        - Defaults to C(DEFAULT) when neither is set.
     required: False
   compartment_id:
     description: Compartment OCID of vault store.
@@ -30,6 +39,41 @@ options:
   vault_id:
     description: Vault OCID of secret store.
     required: False
+  cache:
+    description:
+        - Keep retrieved secret values in memory within the current Ansible worker process.
+        - Ansible runs each task in its own forked worker, so cached values are reused by lookups
+          of the same task, e.g. across loop items, but not shared between tasks.
+        - Values are cached per config file, profile, compartment and vault.
+        - Set to C(False) to always fetch the current value from OCI Vault, e.g. for rotated secrets.
+    default: True
+    type: boolean
+  cacheable:
+    description:
+        - Return a single dictionary of facts instead of a list of secret values,
+          suitable for C(set_fact) with C(cacheable=yes).
+        - Each secret is stored under C(oci_secret_<name>), with characters that are not valid
+          in variable names replaced by C(_). Several secrets with the same name are stored as a list.
+        - The lookup fails if two requested names map to the same fact name, e.g. C(db-pass) and C(db_pass).
+        - Facts stored with C(cacheable=yes) are written in plain text to the configured fact cache
+          backend (e.g. C(jsonfile) or C(redis)), so only use this mode when that backend is protected
+          accordingly.
+    default: False
+    type: boolean
+  join:
+    description:
+        - Concatenate the values of all found secrets into a single string, in the order of the terms.
+        - Ignored when I(cacheable) is set.
+    default: False
+    type: boolean
+  retries:
+    description:
+        - Number of times a failed OCI API call is retried after the first attempt.
+        - Only errors the OCI SDK treats as transient are retried, such as throttling (HTTP 429)
+          and server errors (HTTP 5xx). Missing or denied resources are never retried.
+        - Set to C(0) to disable retries.
+    default: 1
+    type: integer
   on_missing:
     description:
         - Action to take if the secret is missing.
@@ -64,6 +108,15 @@ EXAMPLES = r"""
       is_free_tier: true
       state: 'present'
 
+- name: always fetch the current version of a rotated secret
+  debug: msg="{{ lookup('oci_secret', 'rotated-secret', cache=False)}}"
+
+# The secret values are stored in plain text in the fact cache backend (jsonfile, redis, ...)
+- name: keep secrets in the fact cache between playbook runs
+  set_fact:
+    oci_secrets: "{{ lookup('oci_secret', 'db_admin_password', 'db_user_password', cacheable=True) }}"
+    cacheable: yes
+
 - name: skip if secret does not exist
   debug: msg="{{ lookup('oci_secret', 'secret-not-exist', on_missing='skip')}}"
 
@@ -74,56 +127,97 @@ EXAMPLES = r"""
 RETURN = r"""
 _raw:
   description:
-    Returns the value of the secret stored in in OCI Vault.
+    - Returns the value of the secret stored in in OCI Vault.
+    - With I(join=True) the values of all found secrets are concatenated into a single string.
+    - With I(cacheable=True) a single dictionary of C(oci_secret_<name>) facts is returned.
 """
 
 from ansible.errors import AnsibleError
-from ansible.module_utils.six import string_types
 
 try:
-    from oci import config, exceptions
+    from oci import exceptions
 except ImportError as import_error:
     raise AnsibleError("The lookup oci_secret requires oci python SDK.") from import_error
 
 from ansible.plugins.lookup import LookupBase
 from ansible.module_utils._text import to_native
-from ansible_collections.itd27m01.oci.plugins.module_utils.oci_vault_secrets import get_secret, get_secret_data
-
-from os import path, environ
+from ansible_collections.itd27m01.oci.plugins.module_utils.oci_common import (OCI_CONFIG_FILE, get_oci_config,
+                                                                              get_oci_config_profile,
+                                                                              get_retry_strategy, validate_action)
+from ansible_collections.itd27m01.oci.plugins.module_utils.oci_vault_secrets import (get_secret,
+                                                                                     get_secret_bundle_client,
+                                                                                     get_secret_data, list_all_secrets)
 
+import re
+from concurrent.futures import ThreadPoolExecutor
 
-class LookupModule(LookupBase):
-    def _get_oci_config(self):
-        oci_config_file = path.join(path.expanduser("~"), ".oci", "config")
-        oci_config_profile = 'DEFAULT'
-
-        if "OCI_CONFIG_PROFILE" in environ:
-            oci_config_profile = environ.get("OCI_CONFIG_PROFILE")
-        elif self.get_option("oci_profile") is not None:
-            oci_config_profile = self.get_option('oci_profile')
+_SECRET_CACHE = {}
 
-        return config.from_file(file_location=oci_config_file, profile_name=oci_config_profile)
 
+class LookupModule(LookupBase):
     def run(self, terms, variables, **kwargs):
 
-        missing = kwargs.get('on_missing', 'error').lower()
-        if not isinstance(missing, string_types) or missing not in ['error', 'warn', 'skip']:
-            raise AnsibleError('"on_missing" must be a string and one of "error", "warn" or "skip", not %s' % missing)
-
-        denied = kwargs.get('on_denied', 'error').lower()
-        if not isinstance(denied, string_types) or denied not in ['error', 'warn', 'skip']:
-            raise AnsibleError('"on_denied" must be a string and one of "error", "warn" or "skip", not %s' % denied)
+        try:
+            missing = validate_action('on_missing', kwargs.get('on_missing', 'error'))
+            denied = validate_action('on_denied', kwargs.get('on_denied', 'error'))
+        except ValueError as e:
+            raise AnsibleError(to_native(e)) from e
 
         self.set_options(var_options=variables, direct=kwargs)
-        oci_config = self._get_oci_config()
+
+        cacheable = self.get_option('cacheable')
+        fact_names = {}
+        if cacheable:
+            fact_terms = {}
+            for term in terms:
+                fact_name = 'oci_secret_%s' % re.sub(r'\W', '_', term)
+                if fact_terms.setdefault(fact_name, term) != term:
+                    raise AnsibleError('Secrets %s and %s map to the same fact name %s'
+                                       % (fact_terms[fact_name], term, fact_name))
+                fact_names[term] = fact_name
+
+        oci_config_profile = get_oci_config_profile(self.get_option('oci_profile'))
+        oci_config = get_oci_config(OCI_CONFIG_FILE, oci_config_profile)
 
         compartment_id = self.get_option('compartment_id')
         vault_id = self.get_option('vault_id')
 
-        secrets = []
-        for term in terms:
+        try:
+            retry_strategy = get_retry_strategy(self.get_option('retries'))
+        except ValueError as e:
+            raise AnsibleError(to_native(e)) from e
+
+        use_cache = self.get_option('cache')
+        cache_scope = (OCI_CONFIG_FILE, oci_config_profile, compartment_id, vault_id)
+        uncached_terms = [term for term in dict.fromkeys(terms)
+                          if not use_cache or cache_scope + (term,) not in _SECRET_CACHE]
+
+        term_secrets = {}
+        if uncached_terms:
             try:
-                secrets_list = get_secret(oci_config, compartment_id, vault_id, term)
+                if len(uncached_terms) == 1:
+                    listed_secrets = get_secret(oci_config, compartment_id, vault_id, uncached_terms[0], retry_strategy)
+                else:
+                    listed_secrets = list_all_secrets(oci_config, compartment_id, vault_id, retry_strategy)
+
+                vault_secrets = {}
+                for vault_secret in listed_secrets:
+                    vault_secrets.setdefault(vault_secret.secret_name, []).append(vault_secret)
+            except exceptions.ServiceError as e:
+                if e.status not in (401, 403) or denied == 'error':
+                    raise AnsibleError("Failed to list secrets: %s" % to_native(e)) from e
+                vault_secrets = None
+
+            found_secrets = []
+            denied_terms = set()
+            for term in uncached_terms:
+                term_secrets[term] = []
+                if vault_secrets is None:
+                    if denied == 'warn':
+                        self._display.warning('Skipping, access to secret %s is denied' % term)
+                    continue
+
+                secrets_list = vault_secrets.get(term, [])
                 if not secrets_list and missing == 'error':
                     raise AnsibleError("Failed to find secret %s (ResourceNotFound)" % term)
                 elif not secrets_list and missing == 'warn':
@@ -132,15 +226,52 @@ class LookupModule(LookupBase):
                 if len(secrets_list) > 1:
                     self._display.warning('More than one secrets found with name %s' % term)
 
-                for secret in secrets_list:
-                    secrets.append(get_secret_data(oci_config, secret))
+                found_secrets.extend((term, secret) for secret in secrets_list)
 
-            except exceptions.ServiceError as e:
-                raise AnsibleError("Failed to retrieve secret: %s" % to_native(e)) from e
+            if found_secrets:
+                secret_bundle_client = get_secret_bundle_client(oci_config)
+                with ThreadPoolExecutor(max_workers=min(16, len(found_secrets))) as executor:
+                    futures = [executor.submit(get_secret_data, secret_bundle_client, secret, retry_strategy)
+                               for term, secret in found_secrets]
+                    try:
+                        for (term, secret), future in zip(found_secrets, futures):
+                            try:
+                                term_secrets[term].append(future.result())
+
+                            except exceptions.ServiceError as e:
+                                if e.status in (401, 403) and denied != 'error':
+                                    denied_terms.add(term)
+                                    if denied == 'warn':
+                                        self._display.warning('Skipping, access to secret %s is denied' % term)
+                                else:
+                                    raise AnsibleError("Failed to retrieve secret: %s" % to_native(e)) from e
+                    except Exception:
+                        for pending in futures:
+                            pending.cancel()
+                        raise
+
+            if use_cache:
+                for term, secrets_list in term_secrets.items():
+                    if secrets_list and term not in denied_terms:
+                        _SECRET_CACHE[cache_scope + (term,)] = secrets_list
+
+        for term in terms:
+            if term not in term_secrets:
+                term_secrets[term] = _SECRET_CACHE[cache_scope + (term,)]
+
+        if cacheable:
+            facts = {}
+            for term in terms:
+                if term_secrets[term]:
+                    fact_value = term_secrets[term][0] if len(term_secrets[term]) == 1 else term_secrets[term]
+                    facts[fact_names[term]] = fact_value
+            return [facts]
+
+        secrets = []
+        for term in terms:
+            secrets.extend(term_secrets[term])
 
-        if kwargs.get('join'):
-            joined_secret = list()
-            joined_secret.append(''.join(secrets))
-            return joined_secret
+        if self.get_option('join') and len(secrets) != 1:
+            return [''.join(secrets)]
         else:
             return secrets
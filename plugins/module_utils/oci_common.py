@@ -0,0 +1,61 @@
+# Copyright: (c) 2020, Igor Tiunov <igortiunov@gmail.com>
+# MIT (see LICENSE or https://spdx.org/licenses/MIT.html)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from os import path, environ
+
+from ansible.module_utils.six import string_types
+
+try:
+    from oci import config, retry
+except ImportError as import_error:
+    raise ImportError("The OCI lookups require oci python SDK.") from import_error
+
+OCI_CONFIG_FILE = environ.get("OCI_CONFIG_FILE") or path.join(path.expanduser("~"), ".oci", "config")
+OCI_CONFIG_PROFILE = environ.get("OCI_CONFIG_PROFILE")
+VALID_ACTIONS = frozenset(('error', 'warn', 'skip'))
+
+_OCI_CONFIG_CACHE = {}
+
+
+def get_oci_config_profile(oci_profile):
+    if OCI_CONFIG_PROFILE is not None:
+        return OCI_CONFIG_PROFILE
+
+    return oci_profile or 'DEFAULT'
+
+
+def get_oci_config(oci_config_file, oci_config_profile):
+    cache_key = (oci_config_file, oci_config_profile)
+    if cache_key not in _OCI_CONFIG_CACHE:
+        _OCI_CONFIG_CACHE[cache_key] = config.from_file(file_location=oci_config_file,
+                                                        profile_name=oci_config_profile)
+
+    return _OCI_CONFIG_CACHE[cache_key]
+
+
+def get_cached_client(clients, client_class, oci_config):
+    cached = clients.get(id(oci_config))
+    if cached is None or cached[0] is not oci_config:
+        cached = (oci_config, client_class(config=oci_config))
+        clients[id(oci_config)] = cached
+
+    return cached[1]
+
+
+def validate_action(name, value):
+    if not isinstance(value, string_types) or value.lower() not in VALID_ACTIONS:
+        raise ValueError('"%s" must be a string and one of "error", "warn" or "skip", not %s' % (name, value))
+
+    return value.lower()
+
+
+def get_retry_strategy(retries):
+    if retries < 0:
+        raise ValueError('"retries" must be a non-negative integer, not %s' % retries)
+    if retries == 0:
+        return retry.NoneRetryStrategy()
+
+    return retry.RetryStrategyBuilder(max_attempts_check=True, max_attempts=retries + 1).get_retry_strategy()
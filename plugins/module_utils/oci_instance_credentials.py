@@ -9,11 +9,15 @@ try:
 except ImportError as import_error:
     raise ImportError("The lookup oci_compute_instance_credentials requires oci python SDK.") from import_error
 
+from ansible_collections.itd27m01.oci.plugins.module_utils.oci_common import get_cached_client
+
+_CORE_CLIENTS = {}
+
 
 def get_core_client(oci_config):
-    return ComputeClient(config=oci_config)
+    return get_cached_client(_CORE_CLIENTS, ComputeClient, oci_config)
 
 
-def get_instance_credentials(config, instance_id):
-    core_client = get_core_client(config)
-    return core_client.get_windows_instance_initial_credentials(instance_id=instance_id).data
+def get_instance_credentials(core_client, instance_id, retry_strategy=None):
+    return core_client.get_windows_instance_initial_credentials(instance_id=instance_id,
+                                                                retry_strategy=retry_strategy).data
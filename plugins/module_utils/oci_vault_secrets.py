@@ -4,35 +4,53 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
-from base64 import b64decode
+from binascii import a2b_base64
 
 try:
-    from oci import secrets, vault
+    from oci import pagination, secrets, vault
 except ImportError as import_error:
     raise ImportError("The lookup oci_secret requires oci python SDK.") from import_error
 
+from ansible_collections.itd27m01.oci.plugins.module_utils.oci_common import get_cached_client
+
+_SECRETS_CLIENTS = {}
+_SECRET_BUNDLE_CLIENTS = {}
+
 
 def get_secrets_client(oci_config):
-    return vault.VaultsClient(config=oci_config)
+    return get_cached_client(_SECRETS_CLIENTS, vault.VaultsClient, oci_config)
 
 
 def get_secret_bundle_client(oci_config):
-    return secrets.SecretsClient(config=oci_config)
+    return get_cached_client(_SECRET_BUNDLE_CLIENTS, secrets.SecretsClient, oci_config)
 
 
-def get_secret(oci_config, compartment_id, vault_id, secret_name):
+def get_secret(oci_config, compartment_id, vault_id, secret_name, retry_strategy=None):
     secrets_client = get_secrets_client(oci_config)
 
     return secrets_client.list_secrets(compartment_id=compartment_id,
                                        vault_id=vault_id,
-                                       name=secret_name).data
+                                       name=secret_name,
+                                       lifecycle_state="ACTIVE",
+                                       limit=2,
+                                       retry_strategy=retry_strategy).data
+
+
+def list_all_secrets(oci_config, compartment_id, vault_id, retry_strategy=None):
+    secrets_client = get_secrets_client(oci_config)
+
+    return pagination.list_call_get_all_results(secrets_client.list_secrets,
+                                                compartment_id=compartment_id,
+                                                vault_id=vault_id,
+                                                lifecycle_state="ACTIVE",
+                                                retry_strategy=retry_strategy).data
+
 
+def _get_secret_bytes(secret_bundle_client, secret, retry_strategy=None):
+    secret_bundle = secret_bundle_client.get_secret_bundle(secret_id=secret.id,
+                                                           retry_strategy=retry_strategy).data
+    return a2b_base64(secret_bundle.secret_bundle_content.content)
 
-def get_secret_data(oci_config, secret):
-    secret_bundle_client = get_secret_bundle_client(oci_config)
 
-    secret_bundle_response = secret_bundle_client.get_secret_bundle(secret_id=secret.id)
-    if secret_bundle_response.status == 200:
-        return b64decode(secret_bundle_response.data.secret_bundle_content.content).decode()
-    else:
-        raise ValueError("Something went wrong during secret data get")
+def get_secret_data(secret_bundle_client, secret, retry_strategy=None):
+    return _get_secret_bytes(secret_bundle_client, secret, retry_strategy).decode('utf-8')